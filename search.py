@@ -1,12 +1,28 @@
+import bisect
+import io
+import itertools
 import os
+import threading
 import webbrowser
 import platform
+import re
+import sqlite3
 import subprocess
 import tempfile
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import tkinter as tk
 from tkinter import filedialog, simpledialog, messagebox
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 from mutagen import File as MutagenFile
+from mutagen.easymp4 import EasyMP4
+from mutagen.flac import FLAC
+from mutagen.mp3 import EasyMP3
+from mutagen.oggopus import OggOpus
+from mutagen.oggvorbis import OggVorbis
 from dotenv import load_dotenv
 
 import pygame  # for audio playback
@@ -24,7 +40,76 @@ print(f"Using CLIENT ID '{SPOTIFY_CLIENT_ID}'")
 
 SCOPE = "playlist-modify-public"
 
-BLACKLIST_EXTENSIONS = [".jpg", ".jpeg", ".png", ".gif"]
+SEARCH_CACHE_SIZE = 512
+SEARCH_DEBOUNCE_MS = 250
+SCAN_BATCH = 64
+
+# Matches a track id in either URI form ('spotify:track:...') or open.spotify.com
+# URL form, including locale share links like open.spotify.com/intl-de/track/...
+TRACK_RE = re.compile(
+	r'(?:spotify:track:|open\.spotify\.com/(?:intl-[a-z]{2}(?:-[A-Za-z]{2})?/)?track/)([A-Za-z0-9]{22})'
+)
+
+# Kept for a potential blacklist-mode UI toggle
+BLACKLIST_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png", ".gif"})
+
+# Only files with these suffixes are offered; everything else (.txt, .nfo,
+# .cue, playlists, cover art, ...) would just make mutagen read headers
+# for nothing
+AUDIO_EXTENSIONS = frozenset({
+	".mp3", ".flac", ".m4a", ".aac", ".ogg", ".opus",
+	".wav", ".wma", ".alac", ".aiff", ".ape"
+})
+
+# Dispatch straight to the right parser for the common formats; mutagen's
+# generic File() probes every registered format to sniff the container.
+# The Easy* variants expose tags under plain 'title'/'artist' keys.
+EXT_PARSERS = {
+	".mp3": EasyMP3,
+	".flac": FLAC,
+	".m4a": EasyMP4,
+	".ogg": OggVorbis,
+	".opus": OggOpus,
+}
+
+
+def parse_file_metadata(filepath):
+	"""
+	Parse the title, artist, and duration from a file using mutagen.
+	Module-level and side-effect free so it can be shipped to the
+	metadata worker processes. Returns (title, artist, duration_str).
+	"""
+	title = None
+	artist = None
+	duration_str = None
+
+	try:
+		parser = EXT_PARSERS.get(os.path.splitext(filepath)[1].lower())
+		meta = parser(filepath) if parser else MutagenFile(filepath, easy=True)
+		if meta:
+			# Title & artist ('title'/'artist' keys on all Easy*/Vorbis tags)
+			raw_title = (meta.get("title") or [None])[0]
+			raw_artist = (meta.get("artist") or [None])[0]
+			# easy=True has no effect on WAVE/AIFF: their tags stay raw ID3
+			# frames, so fall back to the frame lookup when the easy keys miss
+			if meta.tags:
+				if raw_title is None and "TIT2" in meta.tags:
+					raw_title = meta.tags["TIT2"]
+				if raw_artist is None and "TPE1" in meta.tags:
+					raw_artist = meta.tags["TPE1"]
+			if raw_title:
+				title = str(raw_title)
+			if raw_artist:
+				artist = str(raw_artist)
+
+			# Duration (if meta.info is available)
+			if hasattr(meta, "info") and meta.info:
+				minutes, seconds = divmod(int(meta.info.length), 60)
+				duration_str = f"{minutes}:{seconds:02d}"
+	except Exception as e:
+		print(f"Error reading metadata from {filepath}: {e}")
+
+	return title, artist, duration_str
 
 
 def reveal_in_explorer(file_path):
@@ -53,6 +138,48 @@ def reveal_in_explorer(file_path):
 		messagebox.showerror("Error", f"Unable to open in file explorer:\n{e}")
 
 
+class ResultRow:
+	"""One recycled search-result row: a radio button plus its action buttons.
+
+	Rows are built once and reconfigured per search instead of being
+	destroyed and recreated, which is much cheaper in Tk.
+	"""
+	def __init__(self, parent, track_var, stop_preview_command):
+		self.frame = tk.Frame(parent)
+
+		self.radio = tk.Radiobutton(
+			self.frame,
+			variable=track_var,
+			justify="left",
+			anchor="w"
+		)
+		self.radio.pack(side="left", padx=5)
+
+		self.visit_button = tk.Button(self.frame, text="Visit")
+		self.visit_button.pack(side="left", padx=5)
+
+		self.preview_play_button = tk.Button(self.frame, text="Play Preview")
+		self.preview_play_button.pack(side="left", padx=5)
+
+		self.preview_stop_button = tk.Button(self.frame, text="Stop", command=stop_preview_command)
+		self.preview_stop_button.pack(side="left", padx=5)
+
+	def show(self):
+		self.frame.pack(anchor='w', pady=2, fill='x')
+
+	def hide(self):
+		self.frame.pack_forget()
+
+	def set_preview_visible(self, visible):
+		"""Show or hide the preview buttons (not every track has a preview URL)."""
+		if visible:
+			self.preview_play_button.pack(side="left", padx=5)
+			self.preview_stop_button.pack(side="left", padx=5)
+		else:
+			self.preview_play_button.pack_forget()
+			self.preview_stop_button.pack_forget()
+
+
 class SpotifyPlaylistApp:
 	def __init__(self, root):
 		self.root = root
@@ -63,6 +190,23 @@ class SpotifyPlaylistApp:
 		self.main_frame = tk.Frame(self.root)
 		self.main_frame.pack(fill="both", expand=True)
 
+		# Shared HTTP session (Spotify API + preview downloads) with a small
+		# connection pool for keep-alive reuse and Retry-After-aware backoff,
+		# so a 429 or a transient 5xx mid-session is retried transparently
+		# instead of erroring straight to the user.
+		self._http = requests.Session()
+		self._http.mount("https://", HTTPAdapter(
+			pool_connections=4,
+			pool_maxsize=4,
+			max_retries=Retry(
+				total=5,
+				backoff_factor=0.5,
+				status_forcelist=(429, 500, 502, 503, 504),
+				allowed_methods=frozenset(["GET", "POST", "PUT", "DELETE"]),
+				respect_retry_after_header=True
+			)
+		))
+
 		# Initialize Spotify client
 		try:
 			self.sp = spotipy.Spotify(
@@ -71,12 +215,22 @@ class SpotifyPlaylistApp:
 					client_secret=SPOTIFY_CLIENT_SECRET,
 					redirect_uri=SPOTIFY_REDIRECT_URI,
 					scope=SCOPE
-				)
+				),
+				requests_session=self._http
 			)
 		except SpotifyOauthError as e:
 			messagebox.showerror("Spotify Auth Error", f"Could not authenticate with Spotify:\n{e}")
 			self.sp = None
 
+		# The authenticated user never changes mid-session, so resolve the
+		# id once here instead of a round-trip on every playlist creation
+		self._user_id = None
+		if self.sp:
+			try:
+				self._user_id = self.sp.current_user()["id"]
+			except Exception as e:
+				print(f"Could not fetch Spotify user id: {e}")
+
 		self.selected_directory = None
 		self.playlist_id = None
 		self.playlist_name = None
@@ -88,8 +242,65 @@ class SpotifyPlaylistApp:
 		self.local_artist = None
 		self.local_duration_str = None
 
-		# Temporary file path for Spotify previews
-		self.preview_temp_path = None
+		# In-memory buffer holding the currently-playing Spotify preview
+		# (kept referenced so it isn't garbage-collected while playing)
+		self._preview_buf = None
+
+		# Prefetched preview clips for the current results, keyed by URL
+		self._preview_prefetch = {}
+
+		# Path/URL currently loaded in pygame.mixer.music; replaying the
+		# same source rewinds instead of reloading and re-parsing it
+		self._loaded_source = None
+
+		# On-disk metadata cache so each file is only parsed by mutagen once,
+		# keyed by (path, mtime, size). Survives across runs.
+		# check_same_thread=False so the prefetch worker can share the
+		# connection; sqlite serializes access internally.
+		self._meta_db = sqlite3.connect(
+			os.path.join(tempfile.gettempdir(), "sp_meta.db"),
+			check_same_thread=False
+		)
+		self._meta_db.execute(
+			"CREATE TABLE IF NOT EXISTS meta ("
+			"path TEXT PRIMARY KEY, mtime INTEGER, size INTEGER, "
+			"title TEXT, artist TEXT, dur TEXT)"
+		)
+		self._meta_cache = {}
+		self._meta_cache_dirty = 0
+
+		# Background pool that prefetches the next file's metadata and
+		# Spotify search while the user looks at the current prompt.
+		self._io_pool = ThreadPoolExecutor(max_workers=2)
+		self._prefetch = {}
+
+		# LRU cache of search results plus debounce state for the Search
+		# button, so repeated/rapid identical queries don't hit the API.
+		# The lock guards the cache against the prefetch worker.
+		self._search_cache = OrderedDict()
+		self._search_cache_lock = threading.Lock()
+		self._search_after_id = None
+
+		# Selected track URIs queued for the playlist; sent in batches of
+		# 100 (Spotify's maximum per request) instead of one call per track.
+		self._pending_uris = []
+		self._playlist_lock = threading.Lock()
+
+		# Directory-scan streaming state: a background thread discovers files
+		# in batches and hands them to the Tk thread for sorted merging, so
+		# the first prompt appears before the full walk completes.
+		self._scan_lock = threading.Lock()
+		self._pending_files = []
+		self._audio_keys = []
+		self._scan_done = True
+		self._scan_gen = 0
+		self._warm_gen = 0
+		self._scan_label = None
+
+		# The file-prompt widget tree is built once and updated in place
+		self._prompt_built = False
+
+		self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
 		self.blacklisted_extensions = BLACKLIST_EXTENSIONS
 
@@ -98,9 +309,14 @@ class SpotifyPlaylistApp:
 
 	def draw_initial_ui(self):
 		"""Draw the initial UI with a button to select a directory."""
-		# Clear any existing widgets
+		# A pending debounced search must not fire against destroyed widgets
+		if self._search_after_id is not None:
+			self.root.after_cancel(self._search_after_id)
+			self._search_after_id = None
+		# Clear any existing widgets (the prompt tree is rebuilt on demand)
 		for widget in self.main_frame.winfo_children():
 			widget.destroy()
+		self._prompt_built = False
 
 		welcome_label = tk.Label(self.main_frame, text="Welcome to the Spotify Playlist Creator!")
 		welcome_label.pack(pady=10)
@@ -112,12 +328,18 @@ class SpotifyPlaylistApp:
 		)
 		select_dir_button.pack(pady=5)
 
-	def create_playlist(self):
-		if self.playlist_name and self.sp:
-			# Create playlist in Spotify
-			user_id = self.sp.current_user()["id"]
-			new_playlist = self.sp.user_playlist_create(user=user_id, name=self.playlist_name, public=True)
-			self.playlist_id = new_playlist["id"]
+	def ensure_playlist(self):
+		"""Create the Spotify playlist once; safe against double-clicks racing
+		two creation calls (which would produce duplicate playlists)."""
+		with self._playlist_lock:
+			if self.playlist_id is not None:
+				return
+			if self.playlist_name and self.sp:
+				# Create playlist in Spotify
+				if self._user_id is None:
+					self._user_id = self.sp.current_user()["id"]
+				new_playlist = self.sp.user_playlist_create(user=self._user_id, name=self.playlist_name, public=True)
+				self.playlist_id = new_playlist["id"]
 
 	def select_directory(self):
 		"""Prompt user to select a directory and then ask for the playlist name."""
@@ -125,80 +347,180 @@ class SpotifyPlaylistApp:
 		if directory:
 			self.selected_directory = directory
 			self.playlist_name = simpledialog.askstring("Playlist Name", "Enter the name for the new Spotify Playlist:")
-			# Gather non-blacklisted files
-			self.audio_files = self.get_audio_files(directory)
-			self.audio_files.sort(key=lambda x: os.path.basename(x).lower())
-			
-			# Start with the first file
+			self.preload_meta_cache(directory)
+
+			# Stream the scan in the background; the first prompt appears
+			# as soon as the first batch of files has been discovered
+			self._prefetch.clear()
 			self.current_index = 0
+			self.current_filepath = None
+			self.audio_files = []
+			self._audio_keys = []
+			self._scan_gen += 1
+			with self._scan_lock:
+				self._pending_files = []
+				self._scan_done = False
+			threading.Thread(
+				target=self.scan_worker,
+				args=(directory, self._scan_gen),
+				daemon=True
+			).start()
+
+	def scan_worker(self, directory, gen):
+		"""Walk the directory on a background thread, handing batches of
+		discovered files to the Tk thread for merging every SCAN_BATCH files."""
+		files = self.get_audio_files(directory)
+		while True:
+			if gen != self._scan_gen:
+				return  # a newer scan superseded this one
+			# islice drains the generator a batch at a time at C level,
+			# instead of a Python-level append per discovered file
+			batch = list(itertools.islice(files, SCAN_BATCH))
+			if not batch:
+				break
+			with self._scan_lock:
+				self._pending_files.extend(batch)
+			self.root.after(0, self.merge_pending_files)
+		with self._scan_lock:
+			self._scan_done = True
+		self.root.after(0, self.merge_pending_files)
+
+	def merge_pending_files(self):
+		"""Merge newly-discovered files into the sorted file list (Tk thread)."""
+		with self._scan_lock:
+			pending = self._pending_files
+			self._pending_files = []
+			scan_done = self._scan_done
+		starved = self.current_index >= len(self.audio_files)
+		# Files at or before the cursor must not shift under the user;
+		# anything discovered late is queued from the cursor onward
+		floor = 0 if self.current_filepath is None else self.current_index + 1
+		for path in pending:
+			key = (os.path.basename(path).lower(), path)
+			pos = max(bisect.bisect(self._audio_keys, key), floor)
+			self._audio_keys.insert(pos, key)
+			self.audio_files.insert(pos, path)
+		if starved and (pending or scan_done):
 			self.show_file_prompt()
+		if scan_done and self.audio_files and self._warm_gen != self._scan_gen:
+			# Scan finished: parse whatever isn't cached yet across all
+			# cores so the UI never waits on mutagen from here on. Several
+			# queued merge callbacks can observe scan_done, so the warm-up
+			# is submitted once per scan generation.
+			self._warm_gen = self._scan_gen
+			self._io_pool.submit(self.warm_meta_cache, list(self.audio_files), self._scan_gen)
+		if self._prompt_built:
+			count = len(self.audio_files)
+			self._scan_label.config(
+				text=f"{count} files found" if scan_done else f"Scanning... {count} files found"
+			)
 
 	def get_audio_files(self, directory):
-		"""Get all non-blacklisted files from the directory (recursively)."""
-		all_files = []
-		for root, dirs, files in os.walk(directory):
-			for filename in files:
-				_, ext = os.path.splitext(filename)
-				if ext.lower() not in self.blacklisted_extensions:
-					all_files.append(os.path.join(root, filename))
-		return all_files
+		"""Yield all files with a known audio extension from the directory (recursively)."""
+		stack = [directory]
+		while stack:
+			try:
+				it = os.scandir(stack.pop())
+			except OSError as e:
+				print(f"Error scanning directory: {e}")
+				continue
+			with it:
+				for entry in it:
+					if entry.is_dir(follow_symlinks=False):
+						stack.append(entry.path)
+					elif entry.is_file(follow_symlinks=False):
+						_, sep, ext = entry.name.rpartition('.')
+						if sep and '.' + ext.lower() in AUDIO_EXTENSIONS:
+							yield entry.path
 
 	def show_file_prompt(self):
 		"""Show the UI for the current file, allowing user to see local metadata,
 		edit the search query, see immediate search results, add track by URL, and skip."""
-		# If we've processed all files, show a 'finished' message
+		# If we've processed all files, flush the queue and show a 'finished' message
 		if self.current_index >= len(self.audio_files):
+			if not self._scan_done:
+				# The scan is still running; merge_pending_files re-shows
+				# the prompt as soon as more files arrive
+				return
+			self.flush_pending_uris()
 			messagebox.showinfo("Done", f"All files processed.\nSkipped songs:\n{self.skipped_songs}")
 			# Optionally redraw the initial UI
 			self.draw_initial_ui()
 			return
 
-		# Clear the main_frame
-		for widget in self.main_frame.winfo_children():
-			widget.destroy()
+		# Build the widget tree once; afterwards we only update it in place
+		if not self._prompt_built:
+			self.build_prompt_ui()
 
 		# Current file
 		self.current_filepath = self.audio_files[self.current_index]
 		filename = os.path.basename(self.current_filepath)
 
-		# Read metadata
-		title, artist, duration_str = self.get_file_metadata(self.current_filepath)
+		# Read metadata (prefetched in the background if available). Keyed
+		# by filepath, not index: streamed-scan inserts can shift indices.
+		prefetched_results = None
+		prefetch = self._prefetch.pop(self.current_filepath, None)
+		if prefetch is not None:
+			try:
+				(title, artist, duration_str), prefetched_results = prefetch.result(timeout=15)
+			except Exception as e:
+				print(f"Prefetch failed for {self.current_filepath}: {e}")
+				title, artist, duration_str = self.get_file_metadata(self.current_filepath)
+		else:
+			title, artist, duration_str = self.get_file_metadata(self.current_filepath)
 		self.local_title = title
 		self.local_artist = artist
 		self.local_duration_str = duration_str
 
 		# Determine prefill text for search
-		if title and artist:
-			prefill_text = f"{title} {artist}"
-		elif title and not artist:
-			prefill_text = title
-		elif not title and artist:
-			prefill_text = artist
-		else:
-			base, _ = os.path.splitext(filename)
-			prefill_text = base
+		prefill_text = self.get_prefill_query(self.current_filepath, title, artist)
+
+		# Update the recycled widgets for this file
+		self._file_label.config(text=f"File: {filename}")
+		self._meta_label.config(text=(
+			f"Local Title: {title or 'Unknown'}\n"
+			f"Local Artist: {artist or 'Unknown'}\n"
+			f"Local Duration: {duration_str or 'Unknown'}"
+		))
+		self.query_var.set(prefill_text)
+		self.url_var.set("")
+
+		# We automatically run the search (reusing prefetched results if any)
+		self.search_spotify(results=prefetched_results)
+
+		# Kick off prefetching for the next file while the user decides
+		next_index = self.current_index + 1
+		if next_index < len(self.audio_files):
+			next_path = self.audio_files[next_index]
+			if next_path not in self._prefetch:
+				self._prefetch[next_path] = self._io_pool.submit(
+					self.prefetch_file, next_path
+				)
+
+	def build_prompt_ui(self):
+		"""Build the file-prompt widget tree once.
+
+		show_file_prompt and do_search afterwards only update text,
+		variables and commands on these widgets instead of destroying
+		and recreating ~15 widgets per file transition."""
+		for widget in self.main_frame.winfo_children():
+			widget.destroy()
 
-		# -- UI Elements --
 		# 1) Filename label
-		file_label = tk.Label(self.main_frame, text=f"File: {filename}", fg="blue")
-		file_label.pack(pady=5)
+		self._file_label = tk.Label(self.main_frame, fg="blue")
+		self._file_label.pack(pady=5)
 
 		# 2) "Show in Explorer" button
 		explorer_button = tk.Button(
 			self.main_frame,
 			text="Show in Explorer",
-			command=lambda path=self.current_filepath: reveal_in_explorer(path)
+			command=self.reveal_current_file
 		)
 		explorer_button.pack(pady=2)
 
 		# 3) Local file metadata
-		meta_label_text = (
-			f"Local Title: {title or 'Unknown'}\n"
-			f"Local Artist: {artist or 'Unknown'}\n"
-			f"Local Duration: {duration_str or 'Unknown'}"
-		)
-		meta_label = tk.Label(self.main_frame, text=meta_label_text)
-		meta_label.pack(pady=5)
+		self._meta_label = tk.Label(self.main_frame)
+		self._meta_label.pack(pady=5)
 
 		# 4) Local playback controls
 		playback_frame = tk.Frame(self.main_frame)
@@ -214,33 +536,44 @@ class SpotifyPlaylistApp:
 		prompt_label = tk.Label(self.main_frame, text="Edit search query if needed:")
 		prompt_label.pack(pady=(10, 0))
 
-		self.query_var = tk.StringVar(value=prefill_text)
+		self.query_var = tk.StringVar()
 		query_entry = tk.Entry(self.main_frame, textvariable=self.query_var, width=50)
 		query_entry.pack(pady=5)
-		
+
 		# 6) Search button
 		search_button = tk.Button(self.main_frame, text="Search", command=self.search_spotify)
 		search_button.pack()
 
-		# 7) Frame for results
+		# 7) Frame for results: five recycled rows, a status label and the Add button
 		self.results_frame = tk.Frame(self.main_frame)
 		self.results_frame.pack(pady=5)
 
+		rows_frame = tk.Frame(self.results_frame)
+		rows_frame.pack(fill='x')
+
+		self.track_var = tk.StringVar()
+		self._result_rows = [
+			ResultRow(rows_frame, self.track_var, self.stop_preview_audio)
+			for _ in range(5)
+		]
+		self._no_results_label = tk.Label(self.results_frame, text="No results found.", fg="red")
+		self._add_button = tk.Button(self.results_frame, text="Add to Playlist", command=self.add_to_playlist)
+
 		# 8) Buttons row
 		buttons_frame = tk.Frame(self.main_frame)
 		buttons_frame.pack()
-		
+
 		# 9) "Spotify Track URL" label & entry
 		url_label = tk.Label(buttons_frame, text="Or enter a Spotify Track URL:")
 		url_label.pack()
 		self.url_var = tk.StringVar()
 		url_entry = tk.Entry(buttons_frame, textvariable=self.url_var, width=50)
 		url_entry.pack(pady=5)
-		
+
 		# 10) Add by url button
 		add_by_url_button = tk.Button(
-			buttons_frame, 
-			text="Add by URL", 
+			buttons_frame,
+			text="Add by URL",
 			command=self.add_track_by_url
 		)
 		add_by_url_button.pack(padx=5)
@@ -253,154 +586,253 @@ class SpotifyPlaylistApp:
 		)
 		skip_button.pack(padx=5)
 
-		# We automatically run the search
-		self.search_spotify()
+		# 12) Scan progress label (updated by merge_pending_files)
+		self._scan_label = tk.Label(self.main_frame, fg="gray")
+		self._scan_label.pack(pady=(5, 0))
+
+		self._prompt_built = True
+
+	def reveal_current_file(self):
+		"""Open the current file's location in the system file explorer."""
+		if self.current_filepath:
+			reveal_in_explorer(self.current_filepath)
+
+	def get_prefill_query(self, filepath, title, artist):
+		"""Build the default search query for a file from its metadata (or filename)."""
+		if title and artist:
+			return f"{title} {artist}"
+		if title:
+			return title
+		if artist:
+			return artist
+		base, _ = os.path.splitext(os.path.basename(filepath))
+		return base
+
+	def prefetch_file(self, filepath):
+		"""Parse a file's metadata and run its Spotify search ahead of time.
+
+		Runs on the background pool so the network round-trip is hidden
+		behind the user's think-time on the current prompt.
+		Returns ((title, artist, duration_str), search_results_or_None).
+		"""
+		meta = self.get_file_metadata(filepath)
+		results = None
+		query = self.get_prefill_query(filepath, meta[0], meta[1])
+		if query and self.sp:
+			try:
+				results = self.raw_search(query)
+			except Exception as e:
+				print(f"Prefetch search failed for {filepath}: {e}")
+		return meta, results
 
 	def add_track_by_url(self):
 		"""
-		If the user enters a Spotify track URL (or URI), we attempt to fetch that
-		track via Spotipy. If valid, add it to the playlist; otherwise, show an error.
+		If the user enters a Spotify track URL (or URI), validate it locally,
+		canonicalize it to a track URI, and queue it for the playlist.
 		"""
+		if self.current_index >= len(self.audio_files):
+			return  # starved: waiting on the scan to discover more files
 		track_url = self.url_var.get().strip()
 		if not track_url:
 			messagebox.showerror("No URL", "Please enter a Spotify track URL or URI.")
 			return
 
-		if self.playlist_id is None:
-			self.create_playlist()
-		try:
-			# sp.track() can accept a full URL or URI, e.g.:
-			# 'https://open.spotify.com/track/123...' or 'spotify:track:123...'
-			track_info = self.sp.track(track_url)  
-			if track_info and track_info["type"] == "track":
-				track_uri = track_info["uri"]
-				self.sp.playlist_add_items(self.playlist_id, [track_uri])
-				messagebox.showinfo("Success", f"Added track by URL:\n{track_info['name']}")
-				self.go_to_next_file()
-			else:
-				messagebox.showerror("Invalid Track", "The provided URL does not correspond to a valid Spotify track.")
-		except Exception as e:
-			messagebox.showerror("Invalid URL", f"Error trying to fetch track:\n{e}")
+		# Validate and canonicalize locally; no sp.track round-trip just to
+		# find out the string is malformed. Accepts e.g.
+		# 'https://open.spotify.com/track/123...' or 'spotify:track:123...'
+		match = TRACK_RE.search(track_url)
+		if not match:
+			messagebox.showerror("Invalid URL", "The provided text is not a Spotify track URL or URI.")
+			return
 
-	def search_spotify(self):
-		"""Perform the search on Spotify (immediately on show_file_prompt) and display up to 5 hits with radio buttons."""
-		# Clear previous search results (and stop any ongoing preview)
-		for widget in self.results_frame.winfo_children():
-			widget.destroy()
+		self.ensure_playlist()
+		track_uri = f"spotify:track:{match.group(1)}"
+		self.queue_track(track_uri)
+		messagebox.showinfo("Success", f"Added track by URL:\n{track_uri}")
+		self.go_to_next_file()
+
+	def raw_search(self, query):
+		"""Run a Spotify track search, memoized in a small LRU cache keyed by
+		the whitespace-normalized lowercase query."""
+		key = " ".join(query.lower().split())
+		with self._search_cache_lock:
+			cached = self._search_cache.get(key)
+			if cached is not None:
+				self._search_cache.move_to_end(key)
+				return cached
+		results = self.sp.search(q=query, limit=5, type='track')
+		with self._search_cache_lock:
+			self._search_cache[key] = results
+			if len(self._search_cache) > SEARCH_CACHE_SIZE:
+				self._search_cache.popitem(last=False)
+		return results
+
+	def search_spotify(self, results=None):
+		"""Debounced entry point for the Search button: coalesces rapid clicks
+		into a single search. Prefetched `results` are displayed immediately."""
+		if results is not None:
+			self.do_search(results)
+			return
+		if self._search_after_id is not None:
+			self.root.after_cancel(self._search_after_id)
+		self._search_after_id = self.root.after(SEARCH_DEBOUNCE_MS, self.do_search)
+
+	def do_search(self, results=None):
+		"""Perform the search on Spotify (immediately on show_file_prompt) and display up to 5 hits with radio buttons.
+
+		If `results` is given (e.g. from a background prefetch), it is used
+		instead of issuing a new API request."""
+		# Cancel any pending debounce timer (it may have been scheduled for
+		# the previous prompt) instead of orphaning it to fire later
+		if self._search_after_id is not None:
+			self.root.after_cancel(self._search_after_id)
+			self._search_after_id = None
+		# Stop any ongoing preview before swapping results
 		self.stop_preview_audio()
+		self._no_results_label.pack_forget()
 
 		query = self.query_var.get().strip()
 		if not query:
+			self.hide_results()
 			return
 
-		results = self.sp.search(q=query, limit=5, type='track')
+		if results is None:
+			results = self.raw_search(query)
 		tracks = results.get('tracks', {}).get('items', [])
 
 		if not tracks:
-			tk.Label(self.results_frame, text="No results found.", fg="red").pack()
+			self.hide_results()
+			self._no_results_label.pack()
 			return
 
-		# Radio variable
-		self.track_var = tk.StringVar()
 		self.track_var.set(tracks[0]['uri'])  # select the top track by default
 
-		# Display each track with radio button
+		# Prefetch the top result's preview clip so Play Preview starts instantly
+		self._preview_prefetch = {}
+		top_preview_url = tracks[0].get('preview_url', None)
+		if top_preview_url:
+			self._io_pool.submit(self.fetch_preview, top_preview_url)
+
+		# Reconfigure one recycled row per track
 		for i, track in enumerate(tracks):
 			track_uri = track['uri']
 			track_name = track['name']
 			artists = ", ".join(artist['name'] for artist in track['artists'])
 			album_name = track['album']['name']
-			duration_ms = track['duration_ms']
-			duration_s = duration_ms // 1000
-			duration_str = f"{duration_s // 60}:{duration_s % 60:02d}"
+			minutes, seconds = divmod(track['duration_ms'] // 1000, 60)
+			duration_str = f"{minutes}:{seconds:02d}"
 			preview_url = track.get('preview_url', None)
 
-			# Frame for each track row
-			row_frame = tk.Frame(self.results_frame)
-			row_frame.pack(anchor='w', pady=2, fill='x')
-
-			# Radio button text
 			text_line = f"{track_name} - {artists}\nAlbum: {album_name} | Duration: {duration_str}"
-			rb = tk.Radiobutton(
-				row_frame,
-				text=text_line,
-				variable=self.track_var,
-				value=track_uri,
-				justify="left",
-				anchor="w"
+			row = self._result_rows[i]
+			row.radio.config(text=text_line, value=track_uri)
+			row.visit_button.config(
+				command=partial(webbrowser.open, track['external_urls']['spotify'])
 			)
-			rb.pack(side="left", padx=5)
-
-			# Visit button
-			visit_button = tk.Button(
-				row_frame,
-				text="Visit",
-				command=lambda url=track['external_urls']['spotify']: webbrowser.open(url)
+			row.preview_play_button.config(
+				command=partial(self.play_spotify_preview, preview_url)
 			)
-			visit_button.pack(side="left", padx=5)
-
-			if preview_url:
-				# Preview playback buttons
-				preview_play_button = tk.Button(
-					row_frame,
-					text="Play Preview",
-					command=lambda url=preview_url: self.play_spotify_preview(url)
-				)
-				preview_play_button.pack(side="left", padx=5)
+			row.set_preview_visible(bool(preview_url))
+			row.show()
 
-				preview_stop_button = tk.Button(
-					row_frame,
-					text="Stop",
-					command=self.stop_preview_audio
-				)
-				preview_stop_button.pack(side="left", padx=5)
+		# Hide unused rows and show the Add button (below the list)
+		for row in self._result_rows[len(tracks):]:
+			row.hide()
+		self._add_button.pack(pady=5)
 
-		# Add button (below the list)
-		add_button = tk.Button(self.results_frame, text="Add to Playlist", command=self.add_to_playlist)
-		add_button.pack(pady=5)
+	def hide_results(self):
+		"""Hide all recycled result rows and the Add button."""
+		for row in self._result_rows:
+			row.hide()
+		self._add_button.pack_forget()
 
 	def play_spotify_preview(self, url):
 		"""Download and play the Spotify preview (if available) via pygame."""
-		self.stop_preview_audio()  # Stop any currently-playing preview first
 		if not url:
 			messagebox.showinfo("Preview Unavailable", "No preview available for this track.")
 			return
+		if self._loaded_source == url:
+			# Same preview already loaded: restart it without reloading
+			pygame.mixer.music.rewind()
+			pygame.mixer.music.play()
+			return
+		self.stop_preview_audio()  # Stop any currently-playing preview first
 		try:
-			# Download the preview MP3 to a temporary file
-			response = requests.get(url, timeout=10)
-			response.raise_for_status()
-			with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as tmp:
-				tmp.write(response.content)
-				tmp.flush()
-				self.preview_temp_path = tmp.name
+			# Use the prefetched clip if we have it; otherwise download it
+			# through the pooled session so the TLS handshake is paid once
+			content = self._preview_prefetch.get(url)
+			if content is None:
+				response = self._http.get(url, timeout=10)
+				response.raise_for_status()
+				content = response.content
+			buf = io.BytesIO(content)
 
 			# Load in pygame and play
-			pygame.mixer.music.load(self.preview_temp_path)
+			pygame.mixer.music.load(buf)
 			pygame.mixer.music.play()
+			self._preview_buf = buf
+			self._loaded_source = url
 		except Exception as e:
+			self._loaded_source = None
 			messagebox.showerror("Error", f"Unable to play preview:\n{e}")
 
+	def fetch_preview(self, url):
+		"""Download a preview clip into the in-memory prefetch cache (I/O pool)."""
+		try:
+			response = self._http.get(url, timeout=10)
+			response.raise_for_status()
+			self._preview_prefetch[url] = response.content
+		except Exception as e:
+			print(f"Preview prefetch failed for {url}: {e}")
+
 	def stop_preview_audio(self):
-		"""Stop any Spotify preview currently playing and remove the temp file."""
+		"""Stop any Spotify preview currently playing. The loaded buffer is
+		kept so the same preview can be replayed with a rewind."""
 		pygame.mixer.music.stop()
-		if self.preview_temp_path and os.path.exists(self.preview_temp_path):
-			try:
-				os.remove(self.preview_temp_path)
-			except Exception as e:
-				print("Failed to remove temp preview file:", e)
-		self.preview_temp_path = None
 
 	def add_to_playlist(self):
-		"""Add the selected track to the Spotify playlist."""
-		if self.playlist_id is None:
-			self.create_playlist()
+		"""Queue the selected track for the Spotify playlist."""
+		if self.current_index >= len(self.audio_files):
+			return  # starved: waiting on the scan to discover more files
+		self.ensure_playlist()
 		selected_track_uri = self.track_var.get()
 		if selected_track_uri:
-			self.sp.playlist_add_items(self.playlist_id, [selected_track_uri])
+			self.queue_track(selected_track_uri)
 		self.go_to_next_file()
 
+	def queue_track(self, track_uri):
+		"""Queue a track URI; the queue is flushed once it reaches a full batch."""
+		self._pending_uris.append(track_uri)
+		if len(self._pending_uris) >= 100:
+			self.flush_pending_uris()
+
+	def flush_pending_uris(self):
+		"""Send all queued track URIs to the playlist, 100 per request."""
+		if self._pending_uris:
+			self.ensure_playlist()
+		while self._pending_uris:
+			chunk = self._pending_uris[:100]
+			self.sp.playlist_add_items(self.playlist_id, chunk)
+			del self._pending_uris[:100]
+
+	def on_close(self):
+		"""Flush queued tracks and persist the metadata cache before exiting."""
+		# Abort any in-flight scan or cache warm-up (their gen checks fail)
+		# and stop the I/O pool; its threads are non-daemon and would
+		# otherwise keep the process alive parsing the library.
+		self._scan_gen += 1
+		self._io_pool.shutdown(wait=False, cancel_futures=True)
+		try:
+			self.flush_pending_uris()
+		except Exception as e:
+			print("Failed to flush queued tracks:", e)
+		self._meta_db.commit()
+		self.root.destroy()
+
 	def skip_file(self):
 		"""Skip the current file (do not add anything to the playlist)."""
+		if self.current_index >= len(self.audio_files):
+			return  # starved: waiting on the scan to discover more files
 		filename = os.path.basename(self.audio_files[self.current_index])
 		self.skipped_songs.append(filename)
 		self.go_to_next_file()
@@ -409,48 +841,112 @@ class SpotifyPlaylistApp:
 		"""Move on to the next file, or finish if we're at the end."""
 		self.stop_local_audio()   # Stop local file playback
 		self.stop_preview_audio() # Stop any Spotify preview
-		self.current_index += 1
+		# Never step past the end: files the streaming scan inserts at the
+		# cursor position would land below it and never be shown
+		self.current_index = min(self.current_index + 1, len(self.audio_files))
 		self.show_file_prompt()
 
 	def play_local_audio(self):
 		"""Play the local audio file using pygame.mixer."""
-		self.stop_local_audio()  # Stop if something else is playing
 		if self.current_filepath and os.path.exists(self.current_filepath):
+			if self._loaded_source == self.current_filepath:
+				# Same file already loaded: restart it without reloading
+				pygame.mixer.music.rewind()
+				pygame.mixer.music.play()
+				return
+			self.stop_local_audio()  # Stop if something else is playing
 			try:
 				pygame.mixer.music.load(self.current_filepath)
 				pygame.mixer.music.play()
+				self._loaded_source = self.current_filepath
+				self._preview_buf = None  # previous preview buffer no longer needed
 			except Exception as e:
+				self._loaded_source = None
 				messagebox.showerror("Playback Error", f"Unable to play file:\n{e}")
 
 	def stop_local_audio(self):
 		"""Stop local audio playback."""
 		pygame.mixer.music.stop()
 
+	def warm_meta_cache(self, paths, gen):
+		"""Parse metadata for all not-yet-cached files on a process pool and
+		fill both cache layers. Mutagen parsing is CPU-bound, so this scales
+		across cores; runs off the Tk thread via the I/O pool."""
+		missing = []
+		for path in paths:
+			try:
+				st = os.stat(path)
+			except OSError:
+				continue
+			cached = self._meta_cache.get(path)
+			if not (cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size):
+				missing.append((path, st))
+		if not missing:
+			return
+		pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+		try:
+			metas = pool.map(parse_file_metadata, [p for p, _ in missing], chunksize=32)
+			for (path, st), (title, artist, duration_str) in zip(missing, metas):
+				if gen != self._scan_gen:
+					return  # superseded (new directory or app closing); stop warming
+				self._meta_cache[path] = (st.st_mtime_ns, st.st_size, title, artist, duration_str)
+				self._meta_db.execute(
+					"INSERT OR REPLACE INTO meta VALUES (?, ?, ?, ?, ?, ?)",
+					(path, st.st_mtime_ns, st.st_size, title, artist, duration_str)
+				)
+			self._meta_db.commit()
+		except Exception as e:
+			print(f"Metadata warm-up failed: {e}")
+		finally:
+			# Don't wait for queued chunks when aborting early; a plain
+			# with-block would block here until the whole library parsed
+			pool.shutdown(wait=False, cancel_futures=True)
+
+	def preload_meta_cache(self, directory):
+		"""Warm the in-memory metadata cache with all stored rows for this directory."""
+		rows = self._meta_db.execute(
+			"SELECT path, mtime, size, title, artist, dur FROM meta WHERE path LIKE ?",
+			(directory + "%",)
+		)
+		for path, mtime, size, title, artist, dur in rows:
+			self._meta_cache[path] = (mtime, size, title, artist, dur)
+
 	def get_file_metadata(self, filepath):
 		"""
 		Extracts the title, artist, and duration from the local file using mutagen.
+		Parsed results are cached (in memory and in the sqlite cache) keyed by
+		(path, mtime, size), so each file is only parsed once across runs.
 		Returns (title, artist, duration_str).
 		"""
-		title = None
-		artist = None
-		duration_str = None
-
 		try:
-			meta = MutagenFile(filepath)
-			if meta:
-				# Title & artist (commonly in ID3 tags for MP3: 'TIT2', 'TPE1')
-				if hasattr(meta, "tags") and meta.tags:
-					if "TIT2" in meta.tags:
-						title = str(meta.tags["TIT2"])
-					if "TPE1" in meta.tags:
-						artist = str(meta.tags["TPE1"])
-
-				# Duration (if meta.info is available)
-				if hasattr(meta, "info") and meta.info:
-					length_seconds = int(meta.info.length)
-					duration_str = f"{length_seconds // 60}:{length_seconds % 60:02d}"
-		except Exception as e:
+			st = os.stat(filepath)
+		except OSError as e:
 			print(f"Error reading metadata from {filepath}: {e}")
+			return None, None, None
+
+		cached = self._meta_cache.get(filepath)
+		if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+			return cached[2], cached[3], cached[4]
+
+		row = self._meta_db.execute(
+			"SELECT mtime, size, title, artist, dur FROM meta WHERE path = ?",
+			(filepath,)
+		).fetchone()
+		if row and row[0] == st.st_mtime_ns and row[1] == st.st_size:
+			self._meta_cache[filepath] = row
+			return row[2], row[3], row[4]
+
+		title, artist, duration_str = parse_file_metadata(filepath)
+
+		self._meta_cache[filepath] = (st.st_mtime_ns, st.st_size, title, artist, duration_str)
+		self._meta_db.execute(
+			"INSERT OR REPLACE INTO meta VALUES (?, ?, ?, ?, ?, ?)",
+			(filepath, st.st_mtime_ns, st.st_size, title, artist, duration_str)
+		)
+		self._meta_cache_dirty += 1
+		if self._meta_cache_dirty >= 32:
+			self._meta_db.commit()
+			self._meta_cache_dirty = 0
 
 		return title, artist, duration_str
 